@@ -8,9 +8,31 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin
 import time
 import json
 import re
+import orjson
+
+# Start of a `listings = [` / `"listings": [` assignment (points at the bracket)
+_LISTINGS_START_RE = re.compile(r'"?listings"?\s*[=:]\s*(?=\[)')
+# JSON strings are consumed whole so brackets inside them are ignored
+_ARRAY_TOKEN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]]')
+_REF_ID_RE = re.compile(r'"ref_id"\s*:\s*(\d+)')
+_LISTINGS_WORD_RE = re.compile('listings', re.IGNORECASE)
+
+def extract_json_array(content, start):
+    """Return the balanced JSON array text starting at content[start], or None"""
+    depth = 0
+    for token in _ARRAY_TOKEN_RE.finditer(content, start):
+        if token.group() == '[':
+            depth += 1
+        elif token.group() == ']':
+            depth -= 1
+            if depth == 0:
+                return content[start:token.end()]
+    return None
 
 def analyze_rentfaster_website(city_url='https://www.rentfaster.ca/on/toronto/rentals'):
     """Analyze how the website loads and displays listings"""
@@ -47,9 +69,13 @@ def analyze_rentfaster_website(city_url='https://www.rentfaster.ca/on/toronto/re
         ('div[class*="listing-"]', 'Any div with listing- class'),
     ]
     
+    # Parse one snapshot of the page locally instead of a WebDriver round trip
+    # for every lookup below
+    soup = BeautifulSoup(driver.page_source, 'lxml')
+    
     for selector, desc in listing_selectors:
         try:
-            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            elements = soup.select(selector)
             if elements:
                 print(f'\n✓ {desc}: {len(elements)} found')
                 print(f'  Selector: {selector}')
@@ -57,18 +83,18 @@ def analyze_rentfaster_website(city_url='https://www.rentfaster.ca/on/toronto/re
                 # Analyze first element
                 if len(elements) > 0:
                     first = elements[0]
-                    text_sample = first.text[:100].replace('\n', ' ')
+                    text_sample = first.get_text(' ', strip=True)[:100]
                     print(f'  Sample text: "{text_sample}..."')
                     
                     # Check for ref_id
-                    ref_id = first.get_attribute('data-ref-id')
+                    ref_id = first.get('data-ref-id')
                     if ref_id:
                         print(f'  ✓ Has ref_id attribute: {ref_id}')
                     
                     # Check for link
-                    links = first.find_elements(By.TAG_NAME, 'a')
-                    if links:
-                        href = links[0].get_attribute('href')
+                    link = first.find('a', href=True)
+                    if link:
+                        href = urljoin(driver.current_url, link['href'])
                         print(f'  ✓ Has link: {href[:50]}...')
         except Exception as e:
             print(f'\n✗ {desc}: Error - {str(e)[:50]}')
@@ -79,44 +105,38 @@ def analyze_rentfaster_website(city_url='https://www.rentfaster.ca/on/toronto/re
     print('=' * 80)
     
     try:
-        # Check all script tags for JSON data
-        scripts = driver.find_elements(By.TAG_NAME, 'script')
+        # Check all script tags for JSON data (one round trip for every script body)
+        scripts = driver.execute_script('return Array.from(document.scripts, s => s.innerHTML)')
         print(f'\nFound {len(scripts)} script tags, analyzing...')
         
         listings_found = []
         
-        for i, script in enumerate(scripts):
+        for i, content in enumerate(scripts):
             try:
-                content = script.get_attribute('innerHTML')
                 if not content or len(content) < 100:
                     continue
                     
                 # Check for listings array
-                if 'listings' in content.lower() and 'ref_id' in content:
+                if 'ref_id' in content and _LISTINGS_WORD_RE.search(content):
                     print(f'\n✓ Script {i+1}: Contains listing data!')
                     
                     # Try to extract JSON
                     # Look for patterns like: var listings = [...] or listings: [...]
-                    patterns = [
-                        r'listings\s*[=:]\s*(\[.*?\])',
-                        r'"listings"\s*:\s*(\[.*?\])',
-                        r'listings:\s*(\[.*?\])',
-                    ]
-                    
-                    for pattern in patterns:
-                        matches = re.findall(pattern, content, re.DOTALL)
-                        if matches:
-                            try:
-                                # Try to parse as JSON
-                                data = json.loads(matches[0])
-                                listings_found.extend(data)
-                                print(f'  → Extracted {len(data)} listings from JSON array')
-                                break
-                            except:
-                                pass
+                    # and scan to the matching bracket instead of a DOTALL regex
+                    for match in _LISTINGS_START_RE.finditer(content):
+                        array_text = extract_json_array(content, match.end())
+                        if not array_text:
+                            continue
+                        try:
+                            data = orjson.loads(array_text)
+                        except orjson.JSONDecodeError:
+                            continue
+                        listings_found.extend(data)
+                        print(f'  → Extracted {len(data)} listings from JSON array')
+                        break
                     
                     # Alternative: count ref_id occurrences
-                    ref_ids = re.findall(r'"ref_id"\s*:\s*(\d+)', content)
+                    ref_ids = _REF_ID_RE.findall(content)
                     if ref_ids:
                         print(f'  → Found {len(ref_ids)} ref_id mentions')
                         print(f'  → Sample IDs: {ref_ids[:5]}')
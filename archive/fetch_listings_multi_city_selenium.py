@@ -1,6 +1,11 @@
 #!/usr/bin/env python3
 """
 Test script to fetch listings using Selenium (bypasses Cloudflare)
+
+When curl_cffi is installed its Chrome TLS impersonation passes Cloudflare
+without a browser. Otherwise Selenium only loads the first API page to pass
+the challenge and its cookies are handed to a requests session. Either way the
+remaining pages are fetched concurrently over HTTP.
 """
 
 from selenium import webdriver
@@ -8,22 +13,44 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+
+try:
+    from curl_cffi import requests as cffi_requests
+except ImportError:  # optional - fall back to warming cookies in Chrome
+    cffi_requests = None
 import time
-import json
 
-def fetch_with_selenium(city_name, city_code):
-    """Fetch listings for a city using Selenium"""
-    print("=" * 80)
-    print(f"🌍 Testing {city_name} with Selenium")
-    print("=" * 80)
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+API_URL = "https://www.rentfaster.ca/api/search.json?proximity_type=location-city&cur_page={page}&type=&beds=&keywords={city_code}"
+
+def impersonated_session(city_code):
+    """Fetch page 1 with curl_cffi's Chrome impersonation and return (session, page 1 data)"""
+    session = cffi_requests.Session(impersonate='chrome120')
+    url = API_URL.format(page=1, city_code=city_code)
+    print(f"\n📍 Page 1 (curl_cffi): {url}")
     
+    try:
+        response = session.get(url, timeout=30)
+        response.raise_for_status()
+        return session, orjson.loads(response.content)
+    except Exception as e:
+        print(f"   ⚠️ Impersonated request failed ({e}), falling back to Selenium")
+        return None, None
+
+def warm_up_session(city_code, concurrency):
+    """Load page 1 in Chrome to pass Cloudflare and return (session, page 1 data)"""
     # Setup Chrome options
     chrome_options = Options()
     # Use visible browser - Cloudflare detects headless
     chrome_options.add_argument('--no-sandbox')
     chrome_options.add_argument('--disable-dev-shm-usage')
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-    chrome_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    chrome_options.add_argument(f'--user-agent={USER_AGENT}')
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
     
@@ -32,83 +59,111 @@ def fetch_with_selenium(city_name, city_code):
     driver = webdriver.Chrome(service=service, options=chrome_options)
     
     # Hide automation
-    driver.execute_cdp_cmd('Network.setUserAgentOverride', {
-        "userAgent": 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-    })
+    driver.execute_cdp_cmd('Network.setUserAgentOverride', {"userAgent": USER_AGENT})
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     
-    all_listings = []
-    
     try:
-        page = 1
-        max_pages = 200  # Safety limit
+        url = API_URL.format(page=1, city_code=city_code)
+        print(f"\n📍 Page 1: {url}")
+        driver.get(url)
         
-        while page <= max_pages:
-            # API endpoint
-            url = f"https://www.rentfaster.ca/api/search.json?proximity_type=location-city&cur_page={page}&type=&beds=&keywords={city_code}"
-            
-            print(f"\n📍 Page {page}: {url}")
-            driver.get(url)
-            
-            if page == 1:
-                # First page needs more time for Cloudflare
-                print("⏳ Waiting for Cloudflare challenge (15 seconds)...")
-                time.sleep(15)
-            else:
-                # Subsequent pages are faster
-                print("⏳ Waiting (3 seconds)...")
-                time.sleep(3)
-            
-            # Get page content
-            page_text = driver.find_element(By.TAG_NAME, 'body').text
-            
-            # Try to parse as JSON
-            try:
-                data = json.loads(page_text)
-                listings = data.get('listings', [])
-                total_count = data.get('total_count', 0)
-                
-                if not listings:
-                    print(f"   ✓ No more listings (page empty)")
-                    break
-                
-                print(f"   ✓ Got {len(listings)} listings")
-                
-                # Add city metadata
-                for listing in listings:
-                    listing['city_code'] = city_code
-                    listing['province_code'] = listing.get('prov', 'ab')
-                
-                all_listings.extend(listings)
-                page += 1
-                
-            except json.JSONDecodeError:
-                print(f"   ❌ Not valid JSON")
-                print(f"   Page content: {page_text[:200]}")
-                
-                if "Just a moment" in page_text:
-                    print("   ⚠️ Still on Cloudflare challenge page")
-                break
+        print("⏳ Waiting for Cloudflare challenge (15 seconds)...")
+        time.sleep(15)
         
-        print(f"\n{'='*80}")
-        print(f"✅ TOTAL: {len(all_listings)} listings from {city_name}")
-        print(f"{'='*80}")
+        page_text = driver.find_element(By.TAG_NAME, 'body').text
+        try:
+            data = orjson.loads(page_text)
+        except orjson.JSONDecodeError:
+            print(f"   ❌ Not valid JSON")
+            print(f"   Page content: {page_text[:200]}")
+            if "Just a moment" in page_text:
+                print("   ⚠️ Still on Cloudflare challenge page")
+            return None, None
         
-        if all_listings:
-            print(f"\nSample listing:")
-            sample = all_listings[0]
-            print(f"  ref_id: {sample.get('ref_id')}")
-            print(f"  title: {sample.get('title', 'N/A')[:50]}...")
-            print(f"  price: ${sample.get('price', 'N/A')}")
-            print(f"  beds: {sample.get('beds', 'N/A')}")
+        # Reuse the Cloudflare clearance cookies outside the browser
+        session = requests.Session()
+        session.headers['User-Agent'] = USER_AGENT
+        session.headers['Accept-Encoding'] = 'gzip, deflate'
         
-        return all_listings
+        # Keep one pooled keep-alive connection per concurrent page fetch and
+        # retry transient errors instead of ending the city early
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, max_retries=retry))
+        for cookie in driver.get_cookies():
+            session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'))
         
+        return session, data
+    
     finally:
-        print("\n⏸️  Browser will close in 3 seconds...")
-        time.sleep(3)
         driver.quit()
-        print("✅ Browser closed\n")
+        print("✅ Browser closed")
+
+def fetch_api_page(session, city_code, page):
+    """Fetch one API page over HTTP, returning its listings or None on failure"""
+    try:
+        response = session.get(API_URL.format(page=page, city_code=city_code), timeout=30)
+        response.raise_for_status()
+        return orjson.loads(response.content).get('listings', [])
+    except Exception as e:
+        print(f"   ❌ Page {page} failed: {e}")
+        return None
+
+def fetch_with_selenium(city_name, city_code, max_pages=200, concurrency=8):
+    """Fetch listings for a city using Selenium"""
+    print("=" * 80)
+    print(f"🌍 Testing {city_name} with Selenium")
+    print("=" * 80)
+    
+    session, data = None, None
+    if cffi_requests is not None:
+        session, data = impersonated_session(city_code)
+    if data is None:
+        session, data = warm_up_session(city_code, concurrency)
+    if data is None:
+        return []
+    
+    all_listings = []
+    pages = {1: data.get('listings', [])}
+    page = 1
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while page <= max_pages:
+            if page not in pages:
+                # Fetch the next window of pages in parallel
+                window = range(page, min(page + concurrency, max_pages + 1))
+                print(f"\n📍 Pages {window.start}-{window.stop - 1}...")
+                pages.update(zip(window, executor.map(lambda p: fetch_api_page(session, city_code, p), window)))
+            
+            listings = pages.pop(page)
+            if listings is None:
+                break
+            if not listings:
+                print(f"   ✓ No more listings (page {page} empty)")
+                break
+            
+            print(f"   ✓ Page {page}: {len(listings)} listings")
+            
+            # Add city metadata
+            for listing in listings:
+                listing['city_code'] = city_code
+                listing['province_code'] = listing.get('prov', 'ab')
+            
+            all_listings.extend(listings)
+            page += 1
+    
+    print(f"\n{'='*80}")
+    print(f"✅ TOTAL: {len(all_listings)} listings from {city_name}")
+    print(f"{'='*80}")
+    
+    if all_listings:
+        print(f"\nSample listing:")
+        sample = all_listings[0]
+        print(f"  ref_id: {sample.get('ref_id')}")
+        print(f"  title: {sample.get('title', 'N/A')[:50]}...")
+        print(f"  price: ${sample.get('price', 'N/A')}")
+        print(f"  beds: {sample.get('beds', 'N/A')}")
+    
+    return all_listings
 
 if __name__ == "__main__":
     # Test Calgary
@@ -119,6 +174,6 @@ if __name__ == "__main__":
     
     if calgary_listings:
         # Save to test file
-        with open('test_calgary_listings.json', 'w', encoding='utf-8') as f:
-            json.dump(calgary_listings, f, indent=2)
+        with open('test_calgary_listings.json', 'wb') as f:
+            f.write(orjson.dumps(calgary_listings, option=orjson.OPT_INDENT_2))
         print(f"\n💾 Saved to test_calgary_listings.json")
@@ -3,7 +3,14 @@
 Investigar preços suspeitos nos dados
 """
 
+import heapq
 import json
+import os
+import sys
+
+# The price parser lives with the maintained scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+from price_parser import parse_price
 
 with open('rentfaster_detailed_offline.json', 'r') as f:
     data = json.load(f)
@@ -11,15 +18,14 @@ with open('rentfaster_detailed_offline.json', 'r') as f:
 # Get all prices (convert to int)
 prices = []
 for l in data:
-    if l.get('price'):
-        try:
-            price = int(l['price']) if isinstance(l['price'], int) else int(str(l['price']).replace(',', '').replace('$', ''))
-            prices.append((price, l))
-        except:
-            pass
+    price = parse_price(l.get('price'))
+    if price is not None:
+        prices.append((price, l))
 
-# Sort by price
-prices.sort(key=lambda x: x[0])
+# Only the extremes are reported, so pick them without sorting everything
+# (largest scans in reverse so ties come out in the same order as a sort)
+smallest = heapq.nsmallest(10, prices, key=lambda x: x[0])
+largest = heapq.nlargest(10, reversed(prices), key=lambda x: x[0])[::-1]
 
 print('=' * 80)
 print('🔍 INVESTIGANDO PREÇOS SUSPEITOS')
@@ -28,7 +34,7 @@ print()
 
 print('📉 10 MENORES PREÇOS:')
 print('-' * 80)
-for i, (price, l) in enumerate(prices[:10], 1):
+for i, (price, l) in enumerate(smallest, 1):
     print(f"{i}. Ref {l['ref_id']}: ${price:,}")
     print(f"   Título: {l.get('title', 'N/A')[:60]}")
     print(f"   Quartos: {l.get('beds', 'N/A')} | Banheiros: {l.get('baths', 'N/A')}")
@@ -40,7 +46,7 @@ for i, (price, l) in enumerate(prices[:10], 1):
 print()
 print('📈 10 MAIORES PREÇOS:')
 print('-' * 80)
-for i, (price, l) in enumerate(prices[-10:], 1):
+for i, (price, l) in enumerate(largest, 1):
     print(f"{i}. Ref {l['ref_id']}: ${price:,}")
     print(f"   Título: {l.get('title', 'N/A')[:60]}")
     print(f"   Quartos: {l.get('beds', 'N/A')} | Banheiros: {l.get('baths', 'N/A')}")
@@ -50,7 +56,7 @@ for i, (price, l) in enumerate(prices[-10:], 1):
 print()
 print('⚠️  PREÇOS ABAIXO DE $500 (SUSPEITOS):')
 print('-' * 80)
-suspicious = [(price, l) for price, l in prices if price < 500]
+suspicious = sorted(((price, l) for price, l in prices if price < 500), key=lambda x: x[0])
 print(f"Total: {len(suspicious)} listings")
 print()
 for price, l in suspicious[:20]:
@@ -3,12 +3,14 @@
 Análise dos dados extraídos pelo scraper offline
 """
 
-import json
 from collections import Counter
+from statistics import median_high
 
-# Load data
-with open('rentfaster_detailed_offline.json', 'r') as f:
-    data = json.load(f)
+import fast_json
+from price_parser import parse_price
+
+# Load data (orjson parses straight from the memory-mapped file)
+data = fast_json.read_json('rentfaster_detailed_offline.json')
 
 print('=' * 80)
 print('📊 ANÁLISE DOS DADOS EXTRAÍDOS')
@@ -20,11 +22,34 @@ total = len(data)
 print(f'Total de listings: {total:,}')
 print()
 
+# Pull every field the report needs out of the listings in a single pass
+parking_values = []
+unrealistic = []
+desc_lengths = []
+prices = []
+types = Counter()
+cities = Counter()
+beds = Counter()
+for l in data:
+    spots = l.get('parking_spots')
+    if spots is not None:
+        parking_values.append(spots)
+        if spots > 10:
+            unrealistic.append(l)
+    description = l.get('full_description')
+    if description:
+        desc_lengths.append(len(description))
+    price = parse_price(l.get('price'))
+    if price is not None:
+        prices.append(price)
+    types[l.get('type', 'N/A')] += 1
+    cities[l.get('city', 'N/A')] += 1
+    beds[l.get('beds', 'N/A')] += 1
+
 # Parking analysis
 print('🅿️  PARKING SPOTS:')
 print('-' * 80)
-parking_data = [l for l in data if l.get('parking_spots') is not None]
-parking_count = len(parking_data)
+parking_count = len(parking_values)
 parking_pct = (parking_count / total * 100) if total > 0 else 0
 
 print(f'Com parking: {parking_count:,} ({parking_pct:.1f}%)')
@@ -32,8 +57,7 @@ print(f'Sem parking: {total - parking_count:,} ({100-parking_pct:.1f}%)')
 print()
 
 # Parking distribution
-if parking_data:
-    parking_values = [l['parking_spots'] for l in parking_data]
+if parking_values:
     parking_counter = Counter(parking_values)
     print('Distribuição de vagas:')
     for spots, count in sorted(parking_counter.items()):
@@ -46,8 +70,7 @@ if parking_data:
     print(f'Mínimo: {min(parking_values)}')
     print(f'Máximo: {max(parking_values)}')
     
-    # Check for unrealistic values
-    unrealistic = [l for l in parking_data if l['parking_spots'] > 10]
+    # Unrealistic values (>10) were collected in the main pass
     if unrealistic:
         print()
         print(f'⚠️  VALORES IRREAIS (>10 vagas): {len(unrealistic)}')
@@ -58,15 +81,13 @@ print()
 # Description analysis
 print('📝 DESCRIÇÕES COMPLETAS:')
 print('-' * 80)
-desc_data = [l for l in data if l.get('full_description')]
-desc_count = len(desc_data)
+desc_count = len(desc_lengths)
 desc_pct = (desc_count / total * 100) if total > 0 else 0
 
 print(f'Com descrição: {desc_count:,} ({desc_pct:.1f}%)')
 print(f'Sem descrição: {total - desc_count:,} ({100-desc_pct:.1f}%)')
 
-if desc_data:
-    desc_lengths = [len(l['full_description']) for l in desc_data]
+if desc_lengths:
     avg_length = sum(desc_lengths) / len(desc_lengths)
     print(f'Tamanho médio: {avg_length:.0f} caracteres')
 print()
@@ -74,7 +95,6 @@ print()
 # Property type analysis
 print('🏢 TIPO DE PROPRIEDADE:')
 print('-' * 80)
-types = Counter([l.get('type', 'N/A') for l in data])
 for ptype, count in types.most_common():
     pct = count / total * 100
     print(f'  {ptype:20s}: {count:4} ({pct:5.1f}%)')
@@ -83,7 +103,6 @@ print()
 # City distribution
 print('🌆 CIDADES:')
 print('-' * 80)
-cities = Counter([l.get('city', 'N/A') for l in data])
 for city, count in cities.most_common():
     pct = count / total * 100
     print(f'  {city:20s}: {count:4} ({pct:5.1f}%)')
@@ -92,7 +111,6 @@ print()
 # Bedrooms analysis
 print('🛏️  QUARTOS:')
 print('-' * 80)
-beds = Counter([l.get('beds', 'N/A') for l in data])
 for bed, count in sorted(beds.items(), key=lambda x: str(x[0])):
     pct = count / total * 100
     print(f'  {str(bed):20s}: {count:4} ({pct:5.1f}%)')
@@ -101,20 +119,11 @@ print()
 # Price analysis
 print('💰 PREÇOS:')
 print('-' * 80)
-prices = []
-for l in data:
-    if l.get('price'):
-        try:
-            price = int(l['price']) if isinstance(l['price'], (int, float)) else int(str(l['price']).replace(',', '').replace('$', ''))
-            prices.append(price)
-        except:
-            pass
-
 if prices:
     print(f'Média: ${sum(prices) / len(prices):,.0f}')
     print(f'Mínimo: ${min(prices):,}')
     print(f'Máximo: ${max(prices):,}')
-    print(f'Mediana: ${sorted(prices)[len(prices)//2]:,}')
+    print(f'Mediana: ${median_high(prices):,}')
     print(f'Total com preço: {len(prices):,} ({len(prices)/total*100:.1f}%)')
 else:
     print('Nenhum preço encontrado')
@@ -133,10 +142,10 @@ if target:
     print(f"  Cidade: {l.get('city', 'N/A')}")
     print(f"  Tipo: {l.get('type', 'N/A')}")
     if l.get('price'):
-        try:
-            price = int(l['price']) if isinstance(l['price'], int) else int(str(l['price']).replace(',', '').replace('$', ''))
+        price = parse_price(l['price'])
+        if price is not None:
             print(f"  Preço: ${price:,}")
-        except:
+        else:
             print(f"  Preço: {l['price']}")
     else:
         print("  Preço: N/A")
@@ -9,9 +9,11 @@ Reads: rentfaster_detailed_offline.json
 Outputs: rentfaster_detailed_offline.json (deduplicated)
 """
 
-import json
+import heapq
+import fast_json
 from datetime import datetime
 
+
 def deduplicate_database():
     print("=" * 80)
     print("🧹 DATABASE DEDUPLICATION")
@@ -19,59 +21,58 @@ def deduplicate_database():
     
     # Load database
     print("\n📂 Loading database...")
-    with open('data/rentfaster_detailed_offline.json', 'r') as f:
-        all_data = json.load(f)
+    all_data = fast_json.read_json('data/rentfaster_detailed_offline.json')
     
     print(f"   Total entries: {len(all_data):,}")
     
-    # Group by ref_id
+    # Pass 1: track only the newest entry per ref_id as (copies, scraped_at, index)
+    # instead of holding every duplicate in a list. ISO timestamps compare as
+    # strings; a missing or null scraped_at counts as the oldest.
     print("\n📊 Analyzing duplicates...")
-    grouped = {}
-    for entry in all_data:
+    newest = {}
+    for idx, entry in enumerate(all_data):
         ref_id = entry.get('ref_id')
-        if ref_id not in grouped:
-            grouped[ref_id] = []
-        grouped[ref_id].append(entry)
+        scraped_at = entry.get('scraped_at') or ''
+        best = newest.get(ref_id)
+        if best is None:
+            newest[ref_id] = (1, scraped_at, idx)
+        elif scraped_at > best[1]:
+            newest[ref_id] = (best[0] + 1, scraped_at, idx)
+        else:
+            newest[ref_id] = (best[0] + 1, best[1], best[2])
     
     # Count duplicates
-    duplicates = {ref_id: entries for ref_id, entries in grouped.items() if len(entries) > 1}
-    print(f"   Unique ref_ids: {len(grouped):,}")
+    duplicates = {ref_id: copies for ref_id, (copies, _, _) in newest.items() if copies > 1}
+    print(f"   Unique ref_ids: {len(newest):,}")
     print(f"   Duplicated ref_ids: {len(duplicates):,}")
     
     if duplicates:
         print(f"\n   Top 10 most duplicated:")
-        sorted_dups = sorted(duplicates.items(), key=lambda x: len(x[1]), reverse=True)[:10]
-        for ref_id, entries in sorted_dups:
-            print(f"      {ref_id}: {len(entries)} copies")
+        top_dups = heapq.nlargest(10, duplicates.items(), key=lambda x: x[1])
+        for ref_id, copies in top_dups:
+            print(f"      {ref_id}: {copies} copies")
     
-    # Keep only most recent for each ref_id
+    # Pass 2: emit the most recent entry for each ref_id
     print(f"\n🔄 Deduplicating...")
     deduplicated = []
     removed = 0
     
-    for ref_id, entries in grouped.items():
-        if len(entries) == 1:
-            # No duplicates, keep as is
-            deduplicated.append(entries[0])
-        else:
-            # Multiple entries, keep most recent
-            # Sort by scraped_at (most recent first)
-            sorted_entries = sorted(entries, key=lambda x: x.get('scraped_at', ''), reverse=True)
-            most_recent = sorted_entries[0]
-            deduplicated.append(most_recent)
-            removed += len(entries) - 1
-            
-            # Debug: show what we're keeping
-            if len(entries) > 2:  # Only show significant duplicates
-                print(f"      {ref_id}: Keeping {most_recent.get('scraped_at', 'Unknown')[:19]} (removed {len(entries)-1} older)")
+    for ref_id, (copies, _, idx) in newest.items():
+        most_recent = all_data[idx]
+        deduplicated.append(most_recent)
+        removed += copies - 1
+        
+        # Debug: show what we're keeping
+        if copies > 2:  # Only show significant duplicates
+            print(f"      {ref_id}: Keeping {(most_recent.get('scraped_at') or 'Unknown')[:19]} (removed {copies-1} older)")
     
     print(f"\n   Entries removed: {removed:,}")
     print(f"   Final count: {len(deduplicated):,}")
     
     # Save deduplicated (backup disabled)
     print(f"\n💾 Saving deduplicated database...")
-    with open('data/rentfaster_detailed_offline.json', 'w', encoding='utf-8') as f:
-        json.dump(deduplicated, f, ensure_ascii=False, indent=2)
+    with open('data/rentfaster_detailed_offline.json', 'wb') as f:
+        f.write(fast_json.dumps(deduplicated, indent=True))
     
     print(f"\n{'='*80}")
     print(f"✅ DEDUPLICATION COMPLETE!")
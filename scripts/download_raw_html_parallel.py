@@ -18,17 +18,23 @@ from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
-import json
 import time
 import random
 import os
 from pathlib import Path
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from functools import lru_cache
 import threading
+import queue
 import sys
 
+import fast_json
+
 # Thread-safe lock for file operations
 file_lock = threading.Lock()
 
@@ -36,6 +42,29 @@ file_lock = threading.Lock()
 RAW_DIR = Path("raw")
 RAW_DIR.mkdir(exist_ok=True)
 
+# Downloaded pages waiting to be written to disk by the writer thread
+write_queue = queue.Queue()
+
+# Visited once per browser before its first listing to pass Cloudflare up front
+HOME_URL = "https://www.rentfaster.ca/"
+CLEARANCE_TIMEOUT = 30
+
+# Stylesheets, fonts and trackers: the offline scraper only reads the DOM text
+BLOCKED_URLS = [
+    '*.css', '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*googlesyndication.com*', '*facebook.net*',
+]
+
+# Restart each worker's Chrome after this many downloads so its memory doesn't keep growing
+RECYCLE_AFTER = 100
+
+# Longest wait for a listing page to render before saving whatever is there
+PAGE_LOAD_TIMEOUT = 10
+
+# Visible text of the page body, or '' while the body is not there yet
+BODY_TEXT_JS = "return document.body ? document.body.innerText : '';"
+
 # Global statistics
 stats = {
     'total': 0,
@@ -50,6 +79,15 @@ stats = {
 }
 stats_lock = threading.Lock()
 
+# Height of the last status block drawn, so the next one can overwrite it
+_status_lines = 0
+
+# Set by workers whenever stats change, so the display only repaints on progress
+status_changed = threading.Event()
+
+# Set on Ctrl+C; workers finish the page they are on and stop taking new listings
+shutdown_event = threading.Event()
+
 def load_cities_config():
     """Load cities configuration from cities_config.json"""
     config_file = Path("cities_config.json")
@@ -64,8 +102,8 @@ def load_cities_config():
             "enabled": True
         }]
     
-    with open(config_file, 'r', encoding='utf-8') as f:
-        config = json.load(f)
+    with open(config_file, 'rb') as f:
+        config = fast_json.loads(f.read())
     
     # Filter enabled cities and sort by priority
     enabled_cities = [city for city in config.get('cities', []) if city.get('enabled', False)]
@@ -75,38 +113,55 @@ def load_cities_config():
 
 def print_live_status():
     """Print live updating status display"""
+    # Copy the counters under the lock and format outside it
     with stats_lock:
-        elapsed = time.time() - stats['start_time'] if stats['start_time'] > 0 else 0.001
-        rate = stats['completed'] / elapsed if elapsed > 0 else 0
-        remaining = (stats['total'] - stats['completed']) / rate if rate > 0 else 0
-        
-        progress_pct = (stats['completed'] / stats['total'] * 100) if stats['total'] > 0 else 0
-        batch_pct = (stats['batches_completed'] / stats['total_batches'] * 100) if stats['total_batches'] > 0 else 0
-        success_pct = (stats['success'] / stats['completed'] * 100) if stats['completed'] > 0 else 0
-        
-        # Create progress bar
-        bar_length = 40
-        filled = int(bar_length * progress_pct / 100)
-        bar = '█' * filled + '░' * (bar_length - filled)
-        
-        # Clear screen and move cursor to top
-        print('\033[2J\033[H', end='')
-        
-        print(f"╔{'═'*78}╗")
-        print(f"║ {'LIVE STATUS - Raw HTML Downloader'.center(76)} ║")
-        print(f"╠{'═'*78}╣")
-        print(f"║ Progress: [{bar}] {progress_pct:5.1f}% ║")
-        print(f"║                                                                              ║")
-        print(f"║ 📊 Downloads:  {stats['completed']:5d}/{stats['total']:5d}  "
-              f"✅ Success: {stats['success']:5d} ({success_pct:5.1f}%)  "
-              f"❌ Failed: {stats['failed']:4d} ║")
-        print(f"║ ⏭️  Skipped: {stats['skipped']:5d} (already downloaded)                                  ║")
-        print(f"║ 📦 Batches:   {stats['batches_completed']:4d}/{stats['total_batches']:4d} ({batch_pct:5.1f}%)  "
-              f"👷 Active Workers: {stats['active_workers']:2d}                    ║")
-        print(f"║ ⏱️  Time:     Elapsed: {elapsed/60:5.1f}m  |  Remaining: ~{remaining/60:5.1f}m  "
-              f"Speed: {rate:5.2f}/s ║")
-        print(f"╚{'═'*78}╝")
-        print(f"\nPress Ctrl+C to stop gracefully...")
+        snap = dict(stats)
+    
+    elapsed = time.time() - snap['start_time'] if snap['start_time'] > 0 else 0.001
+    rate = snap['completed'] / elapsed if elapsed > 0 else 0
+    remaining = (snap['total'] - snap['completed']) / rate if rate > 0 else 0
+    
+    progress_pct = (snap['completed'] / snap['total'] * 100) if snap['total'] > 0 else 0
+    batch_pct = (snap['batches_completed'] / snap['total_batches'] * 100) if snap['total_batches'] > 0 else 0
+    success_pct = (snap['success'] / snap['completed'] * 100) if snap['completed'] > 0 else 0
+    
+    # Create progress bar
+    bar_length = 40
+    filled = int(bar_length * progress_pct / 100)
+    bar = '█' * filled + '░' * (bar_length - filled)
+    
+    lines = [
+        f"╔{'═'*78}╗",
+        f"║ {'LIVE STATUS - Raw HTML Downloader'.center(76)} ║",
+        f"╠{'═'*78}╣",
+        f"║ Progress: [{bar}] {progress_pct:5.1f}% ║",
+        f"║                                                                              ║",
+        f"║ 📊 Downloads:  {snap['completed']:5d}/{snap['total']:5d}  "
+        f"✅ Success: {snap['success']:5d} ({success_pct:5.1f}%)  "
+        f"❌ Failed: {snap['failed']:4d} ║",
+        f"║ ⏭️  Skipped: {snap['skipped']:5d} (already downloaded)                                  ║",
+        f"║ 📦 Workers:   {snap['batches_completed']:4d}/{snap['total_batches']:4d} ({batch_pct:5.1f}%)  "
+        f"👷 Active Workers: {snap['active_workers']:2d}                    ║",
+        f"║ ⏱️  Time:     Elapsed: {elapsed/60:5.1f}m  |  Remaining: ~{remaining/60:5.1f}m  "
+        f"Speed: {rate:5.2f}/s ║",
+        f"╚{'═'*78}╝",
+        "",
+        "Press Ctrl+C to stop gracefully...",
+    ]
+    
+    # Move the cursor back over the previous block and overwrite it in place
+    # (clearing each line) instead of clearing the whole screen
+    global _status_lines
+    if _status_lines:
+        sys.stdout.write(f'\033[{_status_lines}F')
+    sys.stdout.write(''.join(f'{line}\033[K\n' for line in lines))
+    sys.stdout.flush()
+    _status_lines = len(lines)
+
+@lru_cache(maxsize=None)
+def chromedriver_path():
+    """Resolve (and download if needed) the chromedriver binary once per run"""
+    return ChromeDriverManager().install()
 
 def setup_driver(headless=True):
     """Setup Chrome driver with anti-detection options"""
@@ -130,7 +185,9 @@ def setup_driver(headless=True):
     prefs = {
         "credentials_enable_service": False,
         "profile.password_manager_enabled": False,
-        "profile.default_content_setting_values.notifications": 2
+        "profile.default_content_setting_values.notifications": 2,
+        # Listing photos are never used offline - don't download them
+        "profile.managed_default_content_settings.images": 2
     }
     chrome_options.add_experimental_option("prefs", prefs)
     
@@ -141,30 +198,87 @@ def setup_driver(headless=True):
     chrome_options.add_argument('--disable-extensions')
     chrome_options.add_argument('--log-level=3')
     
-    service = Service(ChromeDriverManager().install())
+    service = Service(chromedriver_path())
     driver = webdriver.Chrome(service=service, options=chrome_options)
     
     # Execute CDP commands to avoid detection
     driver.execute_cdp_cmd('Network.setUserAgentOverride', {
         "userAgent": 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
     })
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    # Hide navigator.webdriver on every page the browser loads, before its scripts run
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+        'source': "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+    })
+    
+    # Skip subresources the saved HTML never needs (images are already off via prefs)
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
     
     return driver
 
+def file_writer():
+    """Write queued HTML and metadata files until a None sentinel arrives, counting each listing once it is on disk"""
+    while True:
+        item = write_queue.get()
+        if item is None:
+            break
+        
+        city_dir, ref_id, html_source, metadata = item
+        try:
+            city_dir.mkdir(parents=True, exist_ok=True)
+            
+            # Save to file in city directory
+            with open(city_dir / f"{ref_id}.html", 'w', encoding='utf-8') as f:
+                f.write(html_source)
+            
+            with open(city_dir / f"{ref_id}.json", 'wb') as f:
+                f.write(fast_json.dumps(metadata, indent=True))
+            saved = True
+        except OSError as e:
+            print(f"  [Writer] ❌ Error saving {ref_id}: {e}")
+            saved = False
+        
+        with stats_lock:
+            stats['completed'] += 1
+            if saved:
+                stats['success'] += 1
+            else:
+                stats['failed'] += 1
+        status_changed.set()
+
+def is_challenge_page(driver):
+    """Return True while the browser is showing Cloudflare's challenge page"""
+    # One script call instead of a find_element round trip plus a .text round trip
+    page_text = (driver.execute_script(BODY_TEXT_JS) or '').lower()
+    return 'cloudflare' in page_text or 'verify you are human' in page_text
+
+def warm_up_session(driver, thread_id):
+    """Visit the home page once so every listing it downloads reuses its Cloudflare clearance"""
+    driver.get(HOME_URL)
+    try:
+        WebDriverWait(driver, CLEARANCE_TIMEOUT).until(
+            lambda d: d.get_cookie('cf_clearance') or not is_challenge_page(d)
+        )
+    except TimeoutException:
+        print(f"  [Thread {thread_id}] ⚠️  Cloudflare clearance not confirmed, continuing anyway")
+
 def download_html(driver, url, ref_id, city, thread_id):
     """Download raw HTML for a single listing"""
     try:
         # Navigate to page
         driver.get(url)
         
-        # Random delay for Cloudflare
-        cloudflare_wait = random.uniform(3, 7)
-        time.sleep(cloudflare_wait)
+        # Wait for the listing content to render instead of a fixed 3-7s pause
+        try:
+            WebDriverWait(driver, PAGE_LOAD_TIMEOUT).until(EC.any_of(
+                EC.presence_of_element_located((By.CSS_SELECTOR, '.units-wrap')),
+                EC.presence_of_element_located((By.TAG_NAME, 'h1')),
+            ))
+        except TimeoutException:
+            pass
         
         # Check if Cloudflare challenge is present
-        page_text = driver.find_element(By.TAG_NAME, 'body').text.lower()
-        if 'cloudflare' in page_text or 'verify you are human' in page_text:
+        if is_challenge_page(driver):
             time.sleep(random.uniform(5, 10))
         
         # Small random delay
@@ -176,14 +290,8 @@ def download_html(driver, url, ref_id, city, thread_id):
         # Create city-specific directory structure: raw/{city_code}/
         city_code = city.lower().replace(' ', '_')
         city_dir = RAW_DIR / city_code
-        city_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Save to file in city directory
-        html_file = city_dir / f"{ref_id}.html"
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_source)
         
-        # Save metadata
+        # Metadata saved next to the HTML file
         metadata = {
             'ref_id': ref_id,
             'url': url,
@@ -193,9 +301,8 @@ def download_html(driver, url, ref_id, city, thread_id):
             'success': True
         }
         
-        metadata_file = city_dir / f"{ref_id}.json"
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2)
+        # Hand the writes to the writer thread so this browser can move on
+        write_queue.put((city_dir, ref_id, html_source, metadata))
         
         return True
         
@@ -204,19 +311,27 @@ def download_html(driver, url, ref_id, city, thread_id):
         return False
 
 def download_batch_worker(batch_data):
-    """Worker function that downloads a batch of listings with a single Chrome instance"""
-    batch, worker_id, headless = batch_data
+    """Worker function that keeps one Chrome instance and pulls listings from the shared queue until it is empty"""
+    listing_q, worker_id, headless = batch_data
     driver = None
     results = []
     
     with stats_lock:
         stats['active_workers'] += 1
+    status_changed.set()
     
     try:
-        # Create ONE Chrome instance for this entire batch
+        # Create ONE Chrome instance for everything this worker downloads
         driver = setup_driver(headless=headless)
+        warm_up_session(driver, worker_id)
+        pages_done = 0
         
-        for listing in batch:
+        while not shutdown_event.is_set():
+            try:
+                listing = listing_q.get_nowait()
+            except queue.Empty:
+                break
+            
             ref_id = listing.get('ref_id')
             link = listing.get('link', '')
             # Fix relative URLs - prepend base domain if needed
@@ -234,17 +349,27 @@ def download_batch_worker(batch_data):
                 with stats_lock:
                     stats['completed'] += 1
                     stats['skipped'] += 1
+                status_changed.set()
                 continue
             
+            # Swap in a fresh browser once this one has loaded enough pages
+            if pages_done >= RECYCLE_AFTER:
+                driver.quit()
+                driver = None
+                driver = setup_driver(headless=headless)
+                warm_up_session(driver, worker_id)
+                pages_done = 0
+            
             # Download HTML
             success = download_html(driver, url, ref_id, city, worker_id)
+            pages_done += 1
             
-            with stats_lock:
-                stats['completed'] += 1
-                if success:
-                    stats['success'] += 1
-                else:
+            # Downloaded pages are counted by the writer once they are saved
+            if not success:
+                with stats_lock:
+                    stats['completed'] += 1
                     stats['failed'] += 1
+                status_changed.set()
         
         return True
         
@@ -260,6 +385,7 @@ def download_batch_worker(batch_data):
         with stats_lock:
             stats['active_workers'] -= 1
             stats['batches_completed'] += 1
+        status_changed.set()
 
 def download_parallel(listings, num_workers=5, headless=True):
     """Download listings in parallel using multiple workers"""
@@ -273,26 +399,26 @@ def download_parallel(listings, num_workers=5, headless=True):
     print(f"   Total listings: {total:,}")
     print(f"   Output directory: {RAW_DIR}/{{city_code}}/")
     
-    # Split listings into batches
-    print(f"\n📦 Creating batches...", end='', flush=True)
-    batch_size = max(1, len(listings) // num_workers)
-    batches = []
-    for i in range(0, len(listings), batch_size):
-        batch = listings[i:i + batch_size]
-        worker_id = len(batches) + 1
-        batches.append((batch, worker_id, headless))
+    # Queue every listing; each worker keeps pulling the next one until the queue
+    # runs dry, so a slow stretch of pages never leaves the other browsers idle
+    print(f"\n📦 Queueing listings...", end='', flush=True)
+    listing_q = queue.Queue()
+    for listing in listings:
+        listing_q.put(listing)
+    batches = [(listing_q, worker_id, headless) for worker_id in range(1, min(num_workers, total) + 1)]
     print(f" ✓")
     
-    print(f"\n📥 BATCH DISTRIBUTION:")
+    print(f"\n📥 WORK DISTRIBUTION:")
     print(f"   Total listings: {total:,}")
-    print(f"   Number of batches: {len(batches)}")
-    print(f"   Listings per batch: ~{batch_size}")
-    print(f"   Chrome instances: {len(batches)} (one per batch, reused within batch)")
+    print(f"   Chrome instances: {len(batches)} (one per worker, sharing one queue)")
     
     print(f"\n{'='*80}")
     print(f"🚀 STARTING PARALLEL DOWNLOAD")
     print(f"{'='*80}\n")
     
+    # Resolve chromedriver up front so the workers don't race to download it
+    chromedriver_path()
+    
     start_time = time.time()
     
     # Initialize stats
@@ -303,6 +429,10 @@ def download_parallel(listings, num_workers=5, headless=True):
     # Print initial status
     print_live_status()
     
+    # Single writer thread keeps disk I/O off the browser threads
+    writer_thread = threading.Thread(target=file_writer, daemon=True)
+    writer_thread.start()
+    
     # Execute in parallel with live status updates
     with ThreadPoolExecutor(max_workers=num_workers) as executor:
         # Submit all batch tasks
@@ -315,21 +445,37 @@ def download_parallel(listings, num_workers=5, headless=True):
         stop_updates = threading.Event()
         
         def update_display():
+            # Wait for a worker to report progress, repainting at most once a second
             while not stop_updates.is_set():
-                time.sleep(1)
+                status_changed.wait()
+                status_changed.clear()
                 print_live_status()
+                stop_updates.wait(1)
         
         update_thread = threading.Thread(target=update_display, daemon=True)
         update_thread.start()
         
         # Wait for completion
-        for future in as_completed(future_to_batch):
-            future.result()
+        try:
+            for future in as_completed(future_to_batch):
+                future.result()
+        except KeyboardInterrupt:
+            shutdown_event.set()
+            print("\n\n⚠️  Stopping - waiting for workers to finish their current page...")
+            wait(future_to_batch)
         
         # Stop status updates
         stop_updates.set()
+        status_changed.set()
         update_thread.join(timeout=1)
     
+    # Flush the remaining writes before reporting
+    write_queue.put(None)
+    writer_thread.join()
+    
+    if shutdown_event.is_set():
+        raise KeyboardInterrupt
+    
     # Final status display
     print_live_status()
     
@@ -351,15 +497,18 @@ def main():
     print("📥 RentFaster Raw HTML Downloader (Parallel)")
     print("=" * 80)
     
-    # Parse command line arguments
+    # Parse command line arguments (-y/--yes skips the confirmation prompt)
+    args = [arg for arg in sys.argv[1:] if arg not in ('-y', '--yes')]
+    assume_yes = len(args) < len(sys.argv) - 1
+    
     limit = None
-    if len(sys.argv) > 1:
-        limit_str = sys.argv[1].lower()
+    if len(args) > 0:
+        limit_str = args[0].lower()
         if limit_str in ['all', '0']:
             limit = None
         else:
             try:
-                limit = int(sys.argv[1])
+                limit = int(args[0])
                 if limit == 0:
                     limit = None
             except ValueError:
@@ -367,16 +516,16 @@ def main():
                 sys.exit(1)
     
     num_workers = 5
-    if len(sys.argv) > 2:
+    if len(args) > 1:
         try:
-            num_workers = int(sys.argv[2])
+            num_workers = int(args[1])
         except ValueError:
             print(f"❌ Error: Second parameter must be a number")
             sys.exit(1)
     
     headless = True
-    if len(sys.argv) > 3:
-        headless_str = sys.argv[3].lower()
+    if len(args) > 2:
+        headless_str = args[2].lower()
         if headless_str in ['false', 'no', '0', 'visible']:
             headless = False
     
@@ -393,21 +542,21 @@ def main():
     
     # Load listings
     print("📂 Loading listings...")
-    with open('rentfaster_listings.json', 'r', encoding='utf-8') as f:
-        all_listings = json.load(f)
+    all_listings = fast_json.read_json('rentfaster_listings.json')
     
     print(f"   Loaded {len(all_listings):,} listings\n")
     
-    # Check for already downloaded files (check all city folders)
-    existing_files = []
+    # Check for already downloaded files (check all city folders); scandir
+    # hands back plain names, so no Path object is built per file
+    existing_ids = set()
     for city in enabled_cities:
         city_dir = RAW_DIR / city['city_code']
-        if city_dir.exists():
-            existing_files.extend(list(city_dir.glob("*.html")))
-    existing_ids = {f.stem for f in existing_files}
+        if city_dir.is_dir():
+            with os.scandir(city_dir) as entries:
+                existing_ids.update(entry.name[:-5] for entry in entries if entry.name.endswith('.html'))
     
-    if existing_files:
-        print(f"📝 Found {len(existing_files):,} already downloaded HTML files")
+    if existing_ids:
+        print(f"📝 Found {len(existing_ids):,} already downloaded HTML files")
         remaining = [l for l in all_listings if l.get('ref_id') not in existing_ids]
         print(f"   {len(remaining):,} remaining to download\n")
         all_listings = remaining
@@ -430,7 +579,9 @@ def main():
     print(f"  Estimated time:       ~{len(all_listings) / (num_workers * 0.1) / 60:.1f} minutes")
     print("=" * 80)
     
-    input("\nPress Enter to start (or Ctrl+C to cancel)...")
+    # Only wait for confirmation when someone is at the terminal
+    if sys.stdin.isatty() and not assume_yes:
+        input("\nPress Enter to start (or Ctrl+C to cancel)...")
     
     try:
         download_parallel(all_listings, num_workers=num_workers, headless=headless)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+[UTILITY] Fast JSON
+
+JSON helpers shared by the scripts, using the fastest library available:
+orjson, then ujson, then the standard library json module. orjson is in
+requirements.txt; the fallbacks only matter on platforms without a wheel.
+
+loads() accepts bytes, str or a buffer such as a memoryview.
+dumps() always returns UTF-8 bytes (two-space indent when indent=True).
+read_json() parses a file straight from a memory map.
+"""
+
+import mmap
+
+try:
+    import orjson
+    
+    JSONDecodeError = orjson.JSONDecodeError
+    
+    def loads(data):
+        """Parse a JSON document"""
+        return orjson.loads(data)
+    
+    def dumps(obj, indent=False):
+        """Serialize obj to UTF-8 JSON bytes"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+except ImportError:
+    try:
+        import ujson as _json
+        _DUMP_OPTIONS = {'ensure_ascii': False, 'escape_forward_slashes': False}
+    except ImportError:
+        import json as _json
+        _DUMP_OPTIONS = {'ensure_ascii': False}
+    
+    # Every library's decode error subclasses ValueError
+    JSONDecodeError = ValueError
+    
+    def loads(data):
+        """Parse a JSON document"""
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return _json.loads(data)
+    
+    def dumps(obj, indent=False):
+        """Serialize obj to UTF-8 JSON bytes"""
+        if indent:
+            return _json.dumps(obj, indent=2, **_DUMP_OPTIONS).encode('utf-8')
+        return _json.dumps(obj, **_DUMP_OPTIONS).encode('utf-8')
+
+def read_json(json_path):
+    """Parse a JSON file straight from a memory map, without reading it into a bytes copy first"""
+    with open(json_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        with memoryview(mm) as buf:
+            return loads(buf)
@@ -5,11 +5,13 @@
 This script queries the RentFaster API for each enabled city and combines results.
 Uses Selenium to bypass Cloudflare protection with parallel browser workers.
 
+Each page is also appended to rentfaster_listings.partial.ndjson as it
+arrives, so an interrupted run can be saved with --from-partial.
+
 Reads: cities_config.json
 Outputs: rentfaster_listings.json
 """
 
-import json
 import time
 import argparse
 from pathlib import Path
@@ -21,11 +23,39 @@ from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import threading
+import fast_json
 
 # Thread-safe statistics
 stats_lock = threading.Lock()
 city_stats = {}
 
+# Listings are appended here page by page (one JSON object per line)
+PARTIAL_FILE = 'rentfaster_listings.partial.ndjson'
+OUTPUT_FILE = 'rentfaster_listings.json'
+partial_lock = threading.Lock()
+partial_file = None
+
+# Fetches a list of same-origin URLs in parallel inside the browser, so the
+# requests carry the Cloudflare clearance cookies. Resolves to the response
+# bodies in order, with the HTTP status for an error response and null for
+# a request that failed outright.
+BATCH_FETCH_JS = """
+const urls = arguments[0];
+const done = arguments[arguments.length - 1];
+Promise.all(urls.map(url =>
+    fetch(url, {credentials: 'include'})
+        .then(response => response.ok ? response.text() : response.status)
+        .catch(() => null)
+)).then(done);
+"""
+
+# Pause between page batches: shrinks by 10% after each clean batch and
+# roughly doubles when the server answers 429/5xx, then the batch is retried
+BATCH_DELAY = 3.0
+MIN_BATCH_DELAY = 0.5
+MAX_BATCH_DELAY = 30.0
+MAX_THROTTLE_RETRIES = 3
+
 def load_cities_config():
     """Load cities configuration"""
     config_file = Path("cities_config.json")
@@ -34,71 +64,148 @@ def load_cities_config():
         print("❌ cities_config.json not found!")
         return []
     
-    with open(config_file, 'r', encoding='utf-8') as f:
-        config = json.load(f)
+    with open(config_file, 'rb') as f:
+        config = fast_json.loads(f.read())
     
     enabled_cities = [city for city in config.get('cities', []) if city.get('enabled', False)]
     enabled_cities.sort(key=lambda x: x.get('priority', 999))
     
     return enabled_cities
 
-def fetch_city_listings(city_config, driver, is_first_city, max_pages, worker_id):
+def append_partial(listings):
+    """Append a page of listings to the partial NDJSON file"""
+    if partial_file is None:
+        return
+    
+    lines = b''.join(fast_json.dumps(listing) + b'\n' for listing in listings)
+    with partial_lock:
+        partial_file.write(lines)
+        partial_file.flush()
+
+def recover_partial():
+    """Write rentfaster_listings.json from the partial file of an interrupted run"""
+    if not Path(PARTIAL_FILE).exists():
+        print(f"✅ No {PARTIAL_FILE} found - nothing to recover")
+        return
+    
+    print(f"📂 Reading {PARTIAL_FILE}...")
+    unique = {}
+    with open(PARTIAL_FILE, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            listing = fast_json.loads(line)
+            ref_id = listing.get('ref_id')
+            if ref_id:
+                unique.setdefault(ref_id, listing)
+    
+    with open(OUTPUT_FILE, 'wb') as f:
+        f.write(fast_json.dumps(list(unique.values()), indent=True))
+    print(f"💾 Saved {len(unique):,} unique listings to {OUTPUT_FILE}")
+    Path(PARTIAL_FILE).unlink()
+
+def build_api_url(city_config):
+    """Build the search API URL for a city, without the page number"""
+    if 'city_id' in city_config:
+        return (f"https://www.rentfaster.ca/api/search.json?"
+                f"city_id={city_config['city_id']}&"
+                f"type=&"
+                f"beds=")
+    return (f"https://www.rentfaster.ca/api/search.json?"
+            f"proximity_type=location-city&"
+            f"type=&"
+            f"beds=&"
+            f"keywords={city_config['city_code']}")
+
+def fetch_city_listings(city_config, driver, is_first_city, max_pages, worker_id, page_batch):
     """Fetch listings for a specific city using Selenium to bypass Cloudflare"""
     print(f"[Worker {worker_id}] 📍 Fetching listings for {city_config['name']}...")
     
     all_listings = []
     page = 1
     
+    # Only cur_page changes between requests
+    base_url = build_api_url(city_config)
+    
+    # City info added to each listing, built once per city
+    city_fields = {
+        'city_code': city_config['city_code'],
+        'province_code': city_config['province_code'],
+    }
+    
+    delay = BATCH_DELAY
+    throttle_retries = 0
+    
     while page <= max_pages:
         try:
-            # Build API URL with query parameters
-            if 'city_id' in city_config:
-                url = (f"https://www.rentfaster.ca/api/search.json?"
-                       f"city_id={city_config['city_id']}&"
-                       f"cur_page={page}&"
-                       f"type=&"
-                       f"beds=")
+            if page == 1:
+                print(f"[Worker {worker_id}]    Page {page}...", end='', flush=True)
+                
+                # Load the first page in the browser so Cloudflare can run its challenge
+                driver.get(f"{base_url}&cur_page={page}")
+                
+                # Wait for Cloudflare challenge on first page of first city
+                if is_first_city:
+                    print(f" (waiting 15s for Cloudflare)...", end='', flush=True)
+                    time.sleep(15)
+                else:
+                    time.sleep(3)
+                
+                # Get the JSON response from the page
+                page_texts = [driver.find_element(By.TAG_NAME, 'body').text]
             else:
-                url = (f"https://www.rentfaster.ca/api/search.json?"
-                       f"proximity_type=location-city&"
-                       f"cur_page={page}&"
-                       f"type=&"
-                       f"beds=&"
-                       f"keywords={city_config['city_code']}")
-            
-            print(f"[Worker {worker_id}]    Page {page}...", end='', flush=True)
+                time.sleep(delay)
+                last_page = min(page + page_batch - 1, max_pages)
+                print(f"[Worker {worker_id}]    Pages {page}-{last_page}...", end='', flush=True)
+                
+                # Once cleared, fetch a batch of pages concurrently from inside the browser
+                urls = [f"{base_url}&cur_page={p}" for p in range(page, last_page + 1)]
+                page_texts = driver.execute_async_script(BATCH_FETCH_JS, urls)
             
-            # Load the page
-            driver.get(url)
-            
-            # Wait for Cloudflare challenge on first page of first city
-            if page == 1 and is_first_city:
-                print(f" (waiting 15s for Cloudflare)...", end='', flush=True)
-                time.sleep(15)
-            else:
-                time.sleep(3)
+            batch_count = 0
+            finished = False
+            throttled = False
+            for page_text in page_texts:
+                if page_text is None:
+                    raise RuntimeError(f"request for page {page} failed")
+                if isinstance(page_text, int):
+                    if page_text == 429 or page_text >= 500:
+                        throttled = True
+                        break
+                    raise RuntimeError(f"page {page} returned HTTP {page_text}")
+                
+                data = fast_json.loads(page_text)
+                listings = data.get('listings', [])
+                
+                if not listings:
+                    finished = True
+                    break
+                
+                # Add city info to each listing
+                for listing in listings:
+                    listing.update(city_fields)
+                
+                all_listings.extend(listings)
+                append_partial(listings)
+                batch_count += len(listings)
+                page += 1
             
-            # Get the JSON response from the page
-            page_text = driver.find_element(By.TAG_NAME, 'body').text
-            data = json.loads(page_text)
-            
-            listings = data.get('listings', [])
-            
-            if not listings:
-                print(f" ✓ (empty, done)")
+            if finished:
+                print(f" ✓ ({batch_count} listings, done)" if batch_count else f" ✓ (empty, done)")
                 break
             
-            # Add city info to each listing
-            for listing in listings:
-                listing['city_code'] = city_config['city_code']
-                listing['province_code'] = city_config['province_code']
-            
-            all_listings.extend(listings)
-            print(f" ✓ ({len(listings)} listings)")
-            
-            page += 1
+            if throttled:
+                if throttle_retries == MAX_THROTTLE_RETRIES:
+                    raise RuntimeError(f"still throttled at page {page} after {MAX_THROTTLE_RETRIES} retries")
+                throttle_retries += 1
+                delay = min(MAX_BATCH_DELAY, delay * 2 + 0.5)
+                print(f" ⚠️ ({batch_count} listings, throttled at page {page}, waiting {delay:.1f}s)")
+            else:
+                throttle_retries = 0
+                delay = max(MIN_BATCH_DELAY, delay * 0.9)
+                print(f" ✓ ({batch_count} listings)")
             
-        except json.JSONDecodeError as e:
+        except fast_json.JSONDecodeError as e:
             print(f" ❌ JSON Error: {e}")
             break
         except Exception as e:
@@ -112,7 +219,7 @@ def fetch_city_listings(city_config, driver, is_first_city, max_pages, worker_id
     
     return all_listings
 
-def fetch_city_worker(city_config, max_pages, worker_id, is_first):
+def fetch_city_worker(city_config, max_pages, worker_id, is_first, page_batch):
     """Worker function to fetch listings for a single city in a separate browser"""
     chrome_options = Options()
     chrome_options.add_argument('--disable-blink-features=AutomationControlled')
@@ -122,10 +229,14 @@ def fetch_city_worker(city_config, max_pages, worker_id, is_first):
     
     service = Service(ChromeDriverManager().install())
     driver = webdriver.Chrome(service=service, options=chrome_options)
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    # Hide navigator.webdriver on every page the browser loads, before its scripts run
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+        'source': "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+    })
+    driver.set_script_timeout(60)
     
     try:
-        listings = fetch_city_listings(city_config, driver, is_first, max_pages, worker_id)
+        listings = fetch_city_listings(city_config, driver, is_first, max_pages, worker_id, page_batch)
         return listings
     finally:
         print(f"[Worker {worker_id}] 🌐 Closing browser...")
@@ -138,20 +249,38 @@ def main():
                         help='Maximum number of pages to fetch per city (default: 200)')
     parser.add_argument('--workers', type=int, default=3,
                         help='Number of parallel browser workers (default: 3, max: 10)')
+    parser.add_argument('--page-batch', type=int, default=5,
+                        help='Pages fetched concurrently per browser after the first (default: 5)')
+    parser.add_argument('--from-partial', action='store_true',
+                        help=f'Save the listings in {PARTIAL_FILE} from an interrupted run and exit')
     args = parser.parse_args()
     
+    if args.from_partial:
+        recover_partial()
+        return
+    
+    # A leftover partial file is an interrupted run's only copy of its pages;
+    # never truncate it behind the user's back
+    if Path(PARTIAL_FILE).exists():
+        print(f"❌ {PARTIAL_FILE} from an interrupted run is still here")
+        print("   Run with --from-partial to save its listings, or delete it to start over")
+        return
+    
     # Validate workers
     if args.workers < 1:
         args.workers = 1
     if args.workers > 10:
         print("⚠️  Warning: Maximum 10 workers allowed, using 10")
         args.workers = 10
+    if args.page_batch < 1:
+        args.page_batch = 1
     
     print("=" * 80)
     print("🌍 RENTFASTER MULTI-CITY LISTINGS FETCHER (PARALLEL)")
     print("=" * 80)
     print(f"⚙️  Max pages per city: {args.max_pages}")
     print(f"⚙️  Parallel workers: {args.workers}")
+    print(f"⚙️  Pages per batch: {args.page_batch}")
     
     # Load configuration
     enabled_cities = load_cities_config()
@@ -168,46 +297,52 @@ def main():
     print(f"\n🚀 Starting parallel fetch with {args.workers} workers...")
     start_time = time.time()
     
-    all_listings = []
+    global partial_file
+    partial_file = open(PARTIAL_FILE, 'wb')
     
-    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+    # Deduplicate by ref_id as each city comes in
+    seen = set()
+    unique_listings = []
+    duplicates_removed = 0
+    
+    with partial_file, ThreadPoolExecutor(max_workers=args.workers) as executor:
         # Submit all cities to the worker pool
         futures = []
         for idx, city in enumerate(enabled_cities):
             is_first = (idx == 0)
-            future = executor.submit(fetch_city_worker, city, args.max_pages, idx % args.workers, is_first)
+            future = executor.submit(fetch_city_worker, city, args.max_pages, idx % args.workers, is_first, args.page_batch)
             futures.append(future)
         
         # Collect results as they complete
         for future in as_completed(futures):
             try:
                 city_listings = future.result()
-                all_listings.extend(city_listings)
             except Exception as e:
                 print(f"❌ Error fetching city: {e}")
+                continue
+            
+            for listing in city_listings:
+                ref_id = listing.get('ref_id')
+                if ref_id and ref_id not in seen:
+                    seen.add(ref_id)
+                    unique_listings.append(listing)
+                else:
+                    duplicates_removed += 1
     
     elapsed_time = time.time() - start_time
     
-    # Remove duplicates by ref_id
-    print(f"\n🔍 Removing duplicates...")
-    seen = set()
-    unique_listings = []
-    for listing in all_listings:
-        ref_id = listing.get('ref_id')
-        if ref_id and ref_id not in seen:
-            seen.add(ref_id)
-            unique_listings.append(listing)
-    
-    duplicates_removed = len(all_listings) - len(unique_listings)
     if duplicates_removed > 0:
-        print(f"   Removed {duplicates_removed:,} duplicate listings")
+        print(f"\n🔍 Removed {duplicates_removed:,} duplicate listings")
     
     # Save to file
-    output_file = 'rentfaster_listings.json'
+    output_file = OUTPUT_FILE
     print(f"\n💾 Saving to {output_file}...")
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(unique_listings, f, ensure_ascii=False, indent=2)
+    with open(output_file, 'wb') as f:
+        f.write(fast_json.dumps(unique_listings, indent=True))
+    
+    # The full result is saved, so the page-by-page copy is no longer needed
+    Path(PARTIAL_FILE).unlink()
     
     # Print summary
     print("\n" + "=" * 80)
@@ -46,8 +46,10 @@ def setup_driver():
     service = Service(ChromeDriverManager().install())
     driver = webdriver.Chrome(service=service, options=chrome_options)
     
-    # Hide webdriver property
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    # Hide navigator.webdriver on every page the browser loads, before its scripts run
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+        'source': "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+    })
     
     return driver
 
@@ -72,13 +74,12 @@ def fetch_page(city_config, page_num, driver, worker_id, is_first_page_ever):
                 # Add delay between requests to be respectful
                 time.sleep(0.5)
             
-            # Wait for JSON to load
-            WebDriverWait(driver, 10).until(
+            # Wait for JSON to load (the wait returns the element it found)
+            pre_element = WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.TAG_NAME, "pre"))
             )
             
             # Extract JSON
-            pre_element = driver.find_element(By.TAG_NAME, "pre")
             json_text = pre_element.text
             data = json.loads(json_text)
             
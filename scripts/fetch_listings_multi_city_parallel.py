@@ -122,7 +122,10 @@ def fetch_city_worker(city_config, max_pages, worker_id, is_first):
     
     service = Service(ChromeDriverManager().install())
     driver = webdriver.Chrome(service=service, options=chrome_options)
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    # Hide navigator.webdriver on every page the browser loads, before its scripts run
+    driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+        'source': "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+    })
     
     try:
         listings = fetch_city_listings(city_config, driver, is_first, max_pages, worker_id)
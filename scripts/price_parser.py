@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+[UTILITY] Price Parser
+
+The listing price clean-up shared by the price analysis scripts. Prices come
+back from the API as numbers or as strings like "$1,450"; ranges and free text
+("1200 - 1500", "Call") are not a single price and parse to None.
+"""
+
+_PRICE_STRIP = str.maketrans('', '', ',$')
+
+def parse_price(value):
+    """Return a listing price as an int, or None when missing or not a single number"""
+    if not value:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(str(value).translate(_PRICE_STRIP))
+    except ValueError:
+        return None
@@ -10,26 +10,38 @@ Configuration:
 - Processes HTML files from raw/{city_code}/ folders
 - Combines data from all enabled cities
 
+Each batch of listings is also appended to
+data/rentfaster_detailed_offline.partial.ndjson as soon as it finishes. Ctrl+C
+saves it straight away; after any other kind of interruption, run with
+--from-partial to save what the run completed.
+
 Reads: rentfaster_listings.json, raw/{city_code}/*.html, cities_config.json
 Outputs: rentfaster_detailed_offline.json
 """
 
 from pathlib import Path
-import json
 import time
 import re
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import threading
+import os
+import signal
 import sys
 from bs4 import BeautifulSoup
 
+import fast_json
+
 # Thread-safe lock for file operations
 file_lock = threading.Lock()
 
 # Raw HTML directory
 RAW_DIR = Path("raw")
 
+# Checkpoint of scraped listings, one JSON object per line (open while scraping)
+PARTIAL_FILE = 'data/rentfaster_detailed_offline.partial.ndjson'
+partial_file = None
+
 def load_cities_config():
     """Load cities configuration from cities_config.json"""
     config_file = Path("cities_config.json")
@@ -41,8 +53,8 @@ def load_cities_config():
             "city_code": "calgary"
         }]
     
-    with open(config_file, 'r', encoding='utf-8') as f:
-        config = json.load(f)
+    with open(config_file, 'rb') as f:
+        config = fast_json.loads(f.read())
     
     # Get enabled cities or default city
     enabled_cities = [city for city in config.get('cities', []) if city.get('enabled', False)]
@@ -58,6 +70,50 @@ def load_cities_config():
     enabled_cities.sort(key=lambda x: x.get('priority', 999))
     return enabled_cities
 
+# Parking patterns, tried in order against the lowercased page text
+PARKING_PATTERNS = [
+    re.compile(r'(\d+)\s+spots?\s+per\s+unit'),  # "2 spots per unit"
+    re.compile(r'parking\s+spots[:\s]+(\d+)\s+spot'),  # "Parking Spots: 2 spots"
+    re.compile(r'total\s+property\s+parking\s+spots[:\s]+(\d+)'),  # "Total Property Parking Spots: 2"
+    re.compile(r'(\d+)\s+parking\s+(?:spot|stall|space)s?'),  # "2 parking spots"
+    re.compile(r'(\d+)\s+(?:titled|underground|surface|assigned|reserved)\s+parking'),
+    re.compile(r'parking[:\s]+(\d+)'),
+    re.compile(r'(\d+)\s+stalls?\s+included'),
+]
+
+# ("two parking", "two stall", 2) phrases for counts written out as words
+PARKING_WORD_PHRASES = tuple((f'{word} parking', f'{word} stall', num) for word, num in (
+    ('one', 1), ('two', 2), ('three', 3), ('four', 4),
+    ('five', 5), ('six', 6), ('seven', 7), ('eight', 8)
+))
+
+# Description elements, tried in order before falling back to DESC_PATTERNS
+DESC_SELECTORS = (
+    '.listing-description',
+    '.description',
+    '[class*="description"]',
+    '.property-description',
+    '#description'
+)
+
+# Fallback description patterns, used when no description element is found
+DESC_PATTERNS = [
+    re.compile(r'Welcome to.*?(?=Contact|Apply|Features|Amenities|$)', re.IGNORECASE | re.DOTALL),
+    re.compile(r'This.*?(?=Contact|Apply|Features|Amenities|$)', re.IGNORECASE | re.DOTALL),
+]
+
+BED_PATTERN = re.compile(r'(\d+)\s*(bedroom|bed|bd)', re.IGNORECASE)
+
+# (keyword, display name) pairs searched for in the lowercased page text
+UTILITY_KEYWORDS = tuple((keyword, keyword.title()) for keyword in (
+    'heat', 'water', 'electricity', 'hydro', 'gas', 'internet', 'cable'
+))
+AMENITY_KEYWORDS = tuple((keyword, keyword.title()) for keyword in (
+    'gym', 'fitness', 'pool', 'laundry', 'balcony', 'patio',
+    'dishwasher', 'air conditioning', 'elevator', 'storage',
+    'bike room', 'concierge', 'security'
+))
+
 # Global statistics
 stats = {
     'total': 0,
@@ -71,41 +127,63 @@ stats = {
 }
 stats_lock = threading.Lock()
 
+# Listings handed to a worker process at a time; small enough that progress
+# updates often and a slow stretch of files doesn't hold up the end of the run
+BATCH_SIZE = 100
+
+# Height of the last status block drawn, so the next one can overwrite it
+_status_lines = 0
+
+# Set whenever a batch is tallied, so the display only repaints on progress
+status_changed = threading.Event()
+
 def print_live_status():
     """Print live updating status display"""
+    # Copy the counters under the lock and format outside it
     with stats_lock:
-        elapsed = time.time() - stats['start_time'] if stats['start_time'] > 0 else 0.001
-        rate = stats['completed'] / elapsed if elapsed > 0 else 0
-        remaining = (stats['total'] - stats['completed']) / rate if rate > 0 else 0
-        
-        progress_pct = (stats['completed'] / stats['total'] * 100) if stats['total'] > 0 else 0
-        success_pct = (stats['success'] / stats['completed'] * 100) if stats['completed'] > 0 else 0
-        
-        # Create progress bar
-        bar_length = 40
-        filled = int(bar_length * progress_pct / 100)
-        bar = '█' * filled + '░' * (bar_length - filled)
-        
-        # Clear screen and move cursor to top
-        print('\033[2J\033[H', end='')
-        
-        multi_unit = stats.get('multi_unit_found', 0)
-        total_units = stats.get('total_units_found', 0)
-        
-        print(f"╔{'═'*78}╗")
-        print(f"║ {'LIVE STATUS - Offline Scraper'.center(76)} ║")
-        print(f"╠{'═'*78}╣")
-        print(f"║ Progress: [{bar}] {progress_pct:5.1f}% ║")
-        print(f"║                                                                              ║")
-        print(f"║ 📊 Listings:  {stats['completed']:5d}/{stats['total']:5d}  "
-              f"✅ Success: {stats['success']:5d} ({success_pct:5.1f}%)  "
-              f"❌ Failed: {stats['failed']:4d} ║")
-        print(f"║ 🏢 Multi-Unit: {multi_unit:4d} buildings  |  {total_units:4d} total unit types found        ║")
-        print(f"║ 👷 Active Workers: {stats['active_workers']:2d}                                                        ║")
-        print(f"║ ⏱️  Time:     Elapsed: {elapsed/60:5.1f}m  |  Remaining: ~{remaining/60:5.1f}m  "
-              f"Speed: {rate:5.2f}/s ║")
-        print(f"╚{'═'*78}╝")
-        print(f"\nPress Ctrl+C to stop gracefully...")
+        snap = dict(stats)
+    
+    elapsed = time.time() - snap['start_time'] if snap['start_time'] > 0 else 0.001
+    rate = snap['completed'] / elapsed if elapsed > 0 else 0
+    remaining = (snap['total'] - snap['completed']) / rate if rate > 0 else 0
+    
+    progress_pct = (snap['completed'] / snap['total'] * 100) if snap['total'] > 0 else 0
+    success_pct = (snap['success'] / snap['completed'] * 100) if snap['completed'] > 0 else 0
+    
+    # Create progress bar
+    bar_length = 40
+    filled = int(bar_length * progress_pct / 100)
+    bar = '█' * filled + '░' * (bar_length - filled)
+    
+    multi_unit = snap.get('multi_unit_found', 0)
+    total_units = snap.get('total_units_found', 0)
+    
+    lines = [
+        f"╔{'═'*78}╗",
+        f"║ {'LIVE STATUS - Offline Scraper'.center(76)} ║",
+        f"╠{'═'*78}╣",
+        f"║ Progress: [{bar}] {progress_pct:5.1f}% ║",
+        f"║                                                                              ║",
+        f"║ 📊 Listings:  {snap['completed']:5d}/{snap['total']:5d}  "
+        f"✅ Success: {snap['success']:5d} ({success_pct:5.1f}%)  "
+        f"❌ Failed: {snap['failed']:4d} ║",
+        f"║ 🏢 Multi-Unit: {multi_unit:4d} buildings  |  {total_units:4d} total unit types found        ║",
+        f"║ 👷 Active Workers: {snap['active_workers']:2d}                                                        ║",
+        f"║ ⏱️  Time:     Elapsed: {elapsed/60:5.1f}m  |  Remaining: ~{remaining/60:5.1f}m  "
+        f"Speed: {rate:5.2f}/s ║",
+        f"╚{'═'*78}╝",
+        "",
+        "Press Ctrl+C to stop gracefully...",
+    ]
+    
+    # Move the cursor back over the previous block and overwrite it in place
+    # (clearing each line) instead of clearing the whole screen
+    global _status_lines
+    if _status_lines:
+        sys.stdout.write(f'\033[{_status_lines}F')
+    sys.stdout.write(''.join(f'{line}\033[K\n' for line in lines))
+    sys.stdout.flush()
+    _status_lines = len(lines)
 
 def extract_from_local_html(html_file, ref_id, city, thread_id):
     """Extract details from local HTML file"""
@@ -119,16 +197,16 @@ def extract_from_local_html(html_file, ref_id, city, thread_id):
             # Fallback to root raw/ directory (legacy)
             if not html_file.exists():
                 html_file = RAW_DIR / f"{ref_id}.html"
-        
-        if not html_file.exists():
-            return None
+            
+            if not html_file.exists():
+                return None
         
         # Read HTML file
         with open(html_file, 'r', encoding='utf-8') as f:
             html_content = f.read()
         
         # Parse with BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = BeautifulSoup(html_content, 'lxml')
         page_text = soup.get_text()
         
         details = {
@@ -143,21 +221,12 @@ def extract_from_local_html(html_file, ref_id, city, thread_id):
             'full_description': None,
         }
         
-        # Extract parking with improved patterns
+        # Lowercase the page text once; every keyword check below reuses it
         search_text = page_text.lower()
         
-        parking_patterns = [
-            r'(\d+)\s+spots?\s+per\s+unit',  # "2 spots per unit"
-            r'parking\s+spots[:\s]+(\d+)\s+spot',  # "Parking Spots: 2 spots"
-            r'total\s+property\s+parking\s+spots[:\s]+(\d+)',  # "Total Property Parking Spots: 2"
-            r'(\d+)\s+parking\s+(?:spot|stall|space)s?',  # "2 parking spots"
-            r'(\d+)\s+(?:titled|underground|surface|assigned|reserved)\s+parking',
-            r'parking[:\s]+(\d+)',
-            r'(\d+)\s+stalls?\s+included',
-        ]
-        
-        for pattern in parking_patterns:
-            match = re.search(pattern, search_text)
+        # Extract parking with improved patterns
+        for pattern in PARKING_PATTERNS:
+            match = pattern.search(search_text)
             if match:
                 parking_num = int(match.group(1))
                 if 0 < parking_num < 100:  # Sanity check
@@ -166,26 +235,14 @@ def extract_from_local_html(html_file, ref_id, city, thread_id):
         
         # Also try word-to-number conversion
         if not details['parking_spots']:
-            word_numbers = {
-                'one': 1, 'two': 2, 'three': 3, 'four': 4,
-                'five': 5, 'six': 6, 'seven': 7, 'eight': 8
-            }
-            for word, num in word_numbers.items():
-                if f'{word} parking' in search_text or f'{word} stall' in search_text:
+            for parking_phrase, stall_phrase, num in PARKING_WORD_PHRASES:
+                if parking_phrase in search_text or stall_phrase in search_text:
                     details['parking_spots'] = num
                     break
         
         # Extract full description
         # Look for description sections
-        desc_selectors = [
-            '.listing-description',
-            '.description',
-            '[class*="description"]',
-            '.property-description',
-            '#description'
-        ]
-        
-        for selector in desc_selectors:
+        for selector in DESC_SELECTORS:
             desc_elem = soup.select_one(selector)
             if desc_elem:
                 desc_text = desc_elem.get_text(strip=True)
@@ -195,12 +252,8 @@ def extract_from_local_html(html_file, ref_id, city, thread_id):
         
         # Fallback: Extract from page text
         if not details['full_description']:
-            desc_patterns = [
-                r'Welcome to.*?(?=Contact|Apply|Features|Amenities|$)',
-                r'This.*?(?=Contact|Apply|Features|Amenities|$)',
-            ]
-            for pattern in desc_patterns:
-                match = re.search(pattern, page_text, re.IGNORECASE | re.DOTALL)
+            for pattern in DESC_PATTERNS:
+                match = pattern.search(page_text)
                 if match:
                     desc = match.group(0).strip()
                     if len(desc) > 50:
@@ -208,35 +261,26 @@ def extract_from_local_html(html_file, ref_id, city, thread_id):
                         break
         
         # Extract bedrooms
-        bed_match = re.search(r'(\d+)\s*(bedroom|bed|bd)', page_text, re.IGNORECASE)
+        bed_match = BED_PATTERN.search(page_text)
         if bed_match:
             details['beds'] = int(bed_match.group(1))
-        elif 'bachelor' in page_text.lower() or 'studio' in page_text.lower():
+        elif 'bachelor' in search_text or 'studio' in search_text:
             details['beds'] = 0
         
         # Extract furnished status
-        if 'unfurnished' in page_text.lower():
+        if 'unfurnished' in search_text:
             details['furnished'] = 'Unfurnished'
-        elif 'furnished' in page_text.lower():
+        elif 'furnished' in search_text:
             details['furnished'] = 'Furnished'
         else:
             details['furnished'] = 'Unknown'
         
-        # Extract utilities
-        utilities_keywords = ['heat', 'water', 'electricity', 'hydro', 'gas', 'internet', 'cable']
-        for keyword in utilities_keywords:
-            if keyword in page_text.lower() and 'included' in page_text.lower():
-                details['utilities_included'].append(keyword.title())
+        # Extract utilities (only pages that mention "included" at all)
+        if 'included' in search_text:
+            details['utilities_included'] = [title for keyword, title in UTILITY_KEYWORDS if keyword in search_text]
         
         # Extract amenities
-        amenity_keywords = [
-            'gym', 'fitness', 'pool', 'laundry', 'balcony', 'patio',
-            'dishwasher', 'air conditioning', 'elevator', 'storage',
-            'bike room', 'concierge', 'security'
-        ]
-        for keyword in amenity_keywords:
-            if keyword in page_text.lower():
-                details['amenities'].append(keyword.title())
+        details['amenities'] = [title for keyword, title in AMENITY_KEYWORDS if keyword in search_text]
         
         return details
         
@@ -244,54 +288,82 @@ def extract_from_local_html(html_file, ref_id, city, thread_id):
         print(f"  [Thread {thread_id}] ❌ Error parsing {ref_id}: {e}")
         return None
 
+def ignore_sigint():
+    """Worker process initializer: leave Ctrl+C to the parent, which stops the run"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
 def scrape_batch_worker(batch_data):
-    """Worker function that processes a batch of listings from local files"""
-    batch, worker_id = batch_data
-    results = []
-    
-    with stats_lock:
-        stats['active_workers'] += 1
+    """Worker process that scrapes a batch of listings from local files and returns (results, success count)"""
+    batch, worker_id, html_paths = batch_data
+    success = 0
     
     try:
-        for listing in batch:
+        for listing, html_path in zip(batch, html_paths):
             ref_id = listing.get('ref_id')
             city = listing.get('city', 'unknown')
             
-            # Extract details from local HTML (function will find the file)
-            details = extract_from_local_html(None, ref_id, city, worker_id)
+            # Extract details from local HTML (the function looks the file up
+            # itself when main() didn't find it)
+            details = extract_from_local_html(html_path, ref_id, city, worker_id)
             
             if details:
-                # Merge with original data
-                merged = {**listing, **details}
-                results.append(merged)
-                with stats_lock:
-                    stats['completed'] += 1
-                    stats['success'] += 1
-            else:
-                results.append(listing)
-                with stats_lock:
-                    stats['completed'] += 1
-                    stats['failed'] += 1
+                # Merge into the listing in place (the batch is this process's own copy)
+                listing.update(details)
+                success += 1
         
-        return results
+        return batch, success
         
     except Exception as e:
         print(f"  [Worker {worker_id}] ❌ Fatal batch error: {e}")
-        return [listing for listing in batch]
-    finally:
-        with stats_lock:
-            stats['active_workers'] -= 1
+        return list(batch), success
 
 def save_progress(data, filename='data/rentfaster_detailed_offline.json'):
     """Thread-safe save progress to JSON file"""
     with file_lock:
         # Ensure data directory exists
         Path('data').mkdir(exist_ok=True)
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(fast_json.dumps(data, indent=True))
+
+def append_partial(listings):
+    """Append a batch of scraped listings to the partial NDJSON file"""
+    if partial_file is None:
+        return
+    
+    lines = b''.join(fast_json.dumps(listing) + b'\n' for listing in listings)
+    with file_lock:
+        partial_file.write(lines)
+        partial_file.flush()
 
-def scrape_parallel(listings, num_workers=10):
-    """Scrape listings in parallel from local HTML files"""
+def read_partial():
+    """Return the listings checkpointed in the partial NDJSON file"""
+    listings = []
+    with open(PARTIAL_FILE, 'rb') as f:
+        for line in f:
+            if line.strip():
+                listings.append(fast_json.loads(line))
+    return listings
+
+def recover_partial():
+    """Write the detailed listings JSON from the partial file of an interrupted run"""
+    if not Path(PARTIAL_FILE).exists():
+        print(f"✅ No {PARTIAL_FILE} found - nothing to recover")
+        return
+    
+    print(f"📂 Reading {PARTIAL_FILE}...")
+    listings = read_partial()
+    
+    # Never replace the previous results with an empty file
+    if listings:
+        save_progress(listings)
+        print(f"💾 Saved {len(listings):,} listings to data/rentfaster_detailed_offline.json")
+    else:
+        print("   No finished batches in it - nothing to save")
+    Path(PARTIAL_FILE).unlink()
+
+def scrape_parallel(listings, num_workers=10, html_map=None):
+    """Scrape listings in parallel from local HTML files (html_map: ref_id -> HTML path)"""
+    html_map = html_map or {}
     detailed_listings = []
     total = len(listings)
     
@@ -305,18 +377,18 @@ def scrape_parallel(listings, num_workers=10):
     
     # Split listings into batches
     print(f"\n📦 Creating batches...", end='', flush=True)
-    batch_size = max(1, len(listings) // num_workers)
     batches = []
-    for i in range(0, len(listings), batch_size):
-        batch = listings[i:i + batch_size]
+    for i in range(0, len(listings), BATCH_SIZE):
+        batch = listings[i:i + BATCH_SIZE]
         worker_id = len(batches) + 1
-        batches.append((batch, worker_id))
+        html_paths = [html_map.get(listing.get('ref_id')) for listing in batch]
+        batches.append((batch, worker_id, html_paths))
     print(f" ✓")
     
     print(f"\n📊 BATCH DISTRIBUTION:")
     print(f"   Total listings: {total:,}")
     print(f"   Number of batches: {len(batches)}")
-    print(f"   Listings per batch: ~{batch_size}")
+    print(f"   Listings per batch: {BATCH_SIZE}")
     
     print(f"\n{'='*80}")
     print(f"🚀 STARTING PARALLEL SCRAPING")
@@ -331,8 +403,13 @@ def scrape_parallel(listings, num_workers=10):
     # Print initial status
     print_live_status()
     
-    # Execute in parallel with live status updates
-    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+    # Each finished batch is appended here as it comes back
+    global partial_file
+    Path('data').mkdir(exist_ok=True)
+    partial_file = open(PARTIAL_FILE, 'wb')
+    
+    # Parsing is CPU-bound, so each worker is a separate process with its own GIL
+    with partial_file, ProcessPoolExecutor(max_workers=num_workers, initializer=ignore_sigint) as executor:
         # Submit all batch tasks
         future_to_batch = {
             executor.submit(scrape_batch_worker, batch_data): batch_data 
@@ -343,25 +420,52 @@ def scrape_parallel(listings, num_workers=10):
         stop_updates = threading.Event()
         
         def update_display():
+            # Wait for a batch to be tallied, repainting at most once a second
             while not stop_updates.is_set():
-                time.sleep(0.5)
+                status_changed.wait()
+                status_changed.clear()
                 print_live_status()
+                stop_updates.wait(1)
         
         update_thread = threading.Thread(target=update_display, daemon=True)
         update_thread.start()
         
-        # Process completed batches
-        for future in as_completed(future_to_batch):
-            batch_results = future.result()
+        stats['active_workers'] = min(num_workers, len(batches))
+        pending = set(future_to_batch)
+        
+        # The worker processes can't see stats, so finished batches are tallied here
+        def tally(future):
+            batch_results, success = future.result()
             detailed_listings.extend(batch_results)
+            append_partial(batch_results)
             
-            # Save progress periodically
-            if len(detailed_listings) % 100 == 0:
-                save_progress(detailed_listings)
+            with stats_lock:
+                stats['completed'] += len(batch_results)
+                stats['success'] += success
+                stats['failed'] += len(batch_results) - success
+                stats['active_workers'] = min(num_workers, len(pending))
+            status_changed.set()
         
-        # Stop status updates
-        stop_updates.set()
-        update_thread.join(timeout=1)
+        try:
+            for future in as_completed(future_to_batch):
+                pending.discard(future)
+                tally(future)
+        except KeyboardInterrupt:
+            # Drop the batches that haven't started, let the running ones finish
+            # and keep their results, so the checkpoint matches the work done
+            print("\n\n⚠️  Stopping - waiting for the batches in progress to finish...")
+            executor.shutdown(wait=True, cancel_futures=True)
+            for future in pending:
+                if not future.cancelled() and future.exception() is None:
+                    tally(future)
+            raise
+        finally:
+            # Stop status updates
+            stop_updates.set()
+            status_changed.set()
+            update_thread.join(timeout=1)
+    
+    partial_file = None
     
     # Final status display
     print_live_status()
@@ -380,24 +484,47 @@ def scrape_parallel(listings, num_workers=10):
     
     return detailed_listings
 
+def scan_html_files(directory):
+    """Return {ref_id: path} for the .html files directly inside a directory"""
+    # scandir gets names and file types from a single directory read, with no
+    # Path object or stat() per file
+    with os.scandir(directory) as entries:
+        return {entry.name[:-5]: entry.path for entry in entries
+                if entry.name.endswith('.html') and entry.is_file()}
+
 def main():
     print("=" * 80)
     print("🚀 RentFaster Offline Scraper (Parallel)")
     print("=" * 80)
     
-    # Parse command line arguments
+    # Parse command line arguments (-y/--yes skips the confirmation prompt,
+    # --from-partial saves an interrupted run's partial file and exits)
+    flags = {'-y', '--yes', '--from-partial'}
+    args = [arg for arg in sys.argv[1:] if arg not in flags]
+    assume_yes = '-y' in sys.argv or '--yes' in sys.argv
+    
+    if '--from-partial' in sys.argv:
+        recover_partial()
+        return
+    
+    # A leftover partial file is an interrupted run's only copy of its results;
+    # never truncate it behind the user's back
+    if Path(PARTIAL_FILE).exists():
+        print(f"❌ {PARTIAL_FILE} from an interrupted run is still here")
+        print("   Run with --from-partial to save its listings, or delete it to start over")
+        sys.exit(1)
+    
     num_workers = 10
-    if len(sys.argv) > 1:
+    if len(args) > 0:
         try:
-            num_workers = int(sys.argv[1])
+            num_workers = int(args[0])
         except ValueError:
             print(f"❌ Error: First parameter must be a number (workers)")
             sys.exit(1)
     
     # Load listings
     print("\n📂 Loading listings...")
-    with open('rentfaster_listings.json', 'r', encoding='utf-8') as f:
-        all_listings = json.load(f)
+    all_listings = fast_json.read_json('rentfaster_listings.json')
     
     print(f"   Loaded {len(all_listings):,} listings\n")
     
@@ -409,38 +536,40 @@ def main():
     
     print(f"📍 Enabled cities: {', '.join(c['name'] for c in enabled_cities)}\n")
     
-    # Check how many have HTML files (scan all enabled city folders)
-    html_files = []
-    html_ids = set()
+    # Check how many have HTML files (scan all enabled city folders), mapping each
+    # ref_id to its file so workers open it directly; city folders are scanned
+    # last so they win over legacy files
+    html_count = 0
+    html_map = {}
     
     # Check root raw/ directory (legacy - files without city subdirs)
     if RAW_DIR.exists():
-        legacy_html = list(RAW_DIR.glob("*.html"))
-        html_files.extend(legacy_html)
-        if legacy_html:
-            print(f"   Found {len(legacy_html):,} HTML files in {RAW_DIR}/ (legacy)")
+        legacy_files = scan_html_files(RAW_DIR)
+        html_count += len(legacy_files)
+        html_map.update(legacy_files)
+        if legacy_files:
+            print(f"   Found {len(legacy_files):,} HTML files in {RAW_DIR}/ (legacy)")
     
     # Check all enabled city folders: raw/{city_code}/
     for city in enabled_cities:
         city_dir = RAW_DIR / city['city_code']
-        if city_dir.exists() and city_dir.is_dir():
-            city_html = list(city_dir.glob("*.html"))
-            html_files.extend(city_html)
-            if city_html:
-                print(f"   Found {len(city_html):,} HTML files in {city_dir}/")
-    
-    html_ids = {f.stem for f in html_files}
-    
-    if not html_files:
+        if city_dir.is_dir():
+            city_files = scan_html_files(city_dir)
+            html_count += len(city_files)
+            html_map.update(city_files)
+            if city_files:
+                print(f"   Found {len(city_files):,} HTML files in {city_dir}/")
+    
+    if not html_count:
         print("\n❌ ERROR: No raw HTML files found!")
         print("   Please run 'download_raw_html_parallel.py' first to download HTML files.")
         print(f"   Expected directories: {RAW_DIR}/{{city_code}}/")
         sys.exit(1)
     
-    print(f"\n📁 Total: {len(html_files):,} HTML files across all cities")
+    print(f"\n📁 Total: {html_count:,} HTML files across all cities")
     
     # Filter to only listings with HTML files
-    listings_with_html = [l for l in all_listings if l.get('ref_id') in html_ids]
+    listings_with_html = [l for l in all_listings if l.get('ref_id') in html_map]
     
     if not listings_with_html:
         print("\n❌ ERROR: No matching listings found!")
@@ -456,11 +585,13 @@ def main():
     print(f"  Estimated time:     ~{len(listings_with_html) / (num_workers * 50) / 60:.1f} minutes")
     print("=" * 80)
     
-    input("\nPress Enter to start (or Ctrl+C to cancel)...")
+    # Only wait for confirmation when someone is at the terminal
+    if sys.stdin.isatty() and not assume_yes:
+        input("\nPress Enter to start (or Ctrl+C to cancel)...")
     
     try:
         # Run parallel scraping
-        new_listings = scrape_parallel(listings_with_html, num_workers=num_workers)
+        new_listings = scrape_parallel(listings_with_html, num_workers=num_workers, html_map=html_map)
         
         # Save final results
         print(f"\n{'='*80}")
@@ -469,6 +600,7 @@ def main():
         print(f"Saving JSON...", end='', flush=True)
         save_progress(new_listings)
         print(f" ✓")
+        Path(PARTIAL_FILE).unlink(missing_ok=True)
         
         print(f"\n{'='*80}")
         print(f"✅ COMPLETE!")
@@ -489,9 +621,7 @@ def main():
     
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrupted by user")
-        if 'new_listings' in locals() and new_listings:
-            save_progress(new_listings)
-            print(f"💾 Saved {len(new_listings):,} listings before exit")
+        recover_partial()
 
 if __name__ == "__main__":
     main()
@@ -8,12 +8,11 @@ Reads: rentfaster_detailed_offline.json
 Outputs: Console summary statistics
 """
 
-import json
+import fast_json
 
 def main():
-    # Load data
-    with open('rentfaster_detailed_offline.json', 'r') as f:
-        listings = json.load(f)
+    # Load data (orjson parses straight from the memory-mapped file)
+    listings = fast_json.read_json('rentfaster_detailed_offline.json')
     
     # Count multi-unit buildings
     multi_unit_listings = [l for l in listings if l.get('is_multi_unit')]